@@ -1,3 +1,19 @@
-from .main import load_config, SiteCrawler, run, app
-
 __all__ = ["load_config", "SiteCrawler", "app", "run"]
+
+
+# Lazy re-exports (PEP 562) so importing the package, as the console script
+# does, stays cheap until one of these is actually touched.
+def __getattr__(name):
+    if name == "load_config":
+        from .config import load_config
+
+        return load_config
+    if name == "SiteCrawler":
+        from .crawler import SiteCrawler
+
+        return SiteCrawler
+    if name in ("app", "run"):
+        from . import main
+
+        return getattr(main, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
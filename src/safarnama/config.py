@@ -1,20 +1,32 @@
 import os
+import re
 import yaml
 from loguru import logger
 
+try:  # libyaml's C emitter/parser; plain PyYAML builds fall back to pure Python.
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader
+
 CONFIG_FILE = "config.yaml"
 ENV_FILE = ".env"
 
+# KEY=value lines; leading-# comment lines never match because the key part
+# excludes '#' at the start.
+_ENV_RE = re.compile(r"(?m)^\s*([^#=\s][^=]*)=(.*)$")
+
 DEFAULT_CONFIG = {
     "base_url": "https://www.techbend.io",
     "max_depth": 2,
     "delay": 1,
+    "concurrency": 5,  # pages fetched in parallel per crawl batch
     "db_path": "python.db",
     "verbose": True,
     "save": True,
     "log_file": "techbend.log",
     "generate_sitemap": True,
     "recursive_crawl": True,
+    "max_page_size": 10485760,  # 10 MB; larger responses are skipped unread
     "download_binaries": False,
     "download_specific_binaries": [],
     "find_images": False,
@@ -62,32 +74,28 @@ DEFAULT_CONFIG = {
 }
 
 
+def _parse_env(env_file: str = ENV_FILE) -> dict:
+    """Read a .env file into a dict; the single parser behind load_dotenv/update_env."""
+    if not os.path.exists(env_file):
+        return {}
+    with open(env_file, "r") as f:
+        data = f.read()
+    return {
+        match.group(1).strip(): match.group(2).strip()
+        for match in _ENV_RE.finditer(data)
+    }
+
+
 def load_dotenv(env_file: str = ENV_FILE) -> None:
-    if os.path.exists(env_file):
-        with open(env_file, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    os.environ.setdefault(key.strip(), value.strip())
+    for key, value in _parse_env(env_file).items():
+        os.environ.setdefault(key, value)
 
 
 def update_env(key: str, value: str, env_file: str = ENV_FILE) -> None:
     """
     Update or add a key/value pair in the .env file and set it in os.environ.
     """
-    env_vars = {}
-    if os.path.exists(env_file):
-        with open(env_file, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" in line:
-                    k, v = line.split("=", 1)
-                    env_vars[k.strip()] = v.strip()
+    env_vars = _parse_env(env_file)
     env_vars[key] = value
     with open(env_file, "w") as f:
         for k, v in env_vars.items():
@@ -95,12 +103,37 @@ def update_env(key: str, value: str, env_file: str = ENV_FILE) -> None:
     os.environ[key] = value
 
 
+def dump_config(config: dict, config_file: str = CONFIG_FILE) -> None:
+    """Serialize the config once and write it with a single call."""
+    payload = yaml.dump(config, Dumper=_YamlDumper)
+    with open(config_file, "w") as f:
+        f.write(payload)
+
+
+# Parsed configs keyed by (path, mtime_ns); a rewrite of the file changes
+# the mtime and naturally invalidates the entry.
+_CONFIG_CACHE = {}
+
+
+def clear_config_cache() -> None:
+    """Drop all cached parsed configs; mainly useful in tests."""
+    _CONFIG_CACHE.clear()
+
+
 def load_config(config_file: str = CONFIG_FILE) -> dict:
     load_dotenv()
+    try:
+        mtime_ns = os.stat(config_file).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    if mtime_ns is not None:
+        cached = _CONFIG_CACHE.get((config_file, mtime_ns))
+        if cached is not None:
+            return cached
     config = {}
     if os.path.exists(config_file):
         with open(config_file, "r") as f:
-            config = yaml.safe_load(f) or {}
+            config = yaml.load(f, Loader=_YamlLoader) or {}
     updated = False
     for key, value in DEFAULT_CONFIG.items():
         if key not in config:
@@ -112,9 +145,11 @@ def load_config(config_file: str = CONFIG_FILE) -> dict:
                     config[key][sub_key] = sub_value
                     updated = True
         elif isinstance(value, list):
+            existing = set(config[key])
             for item in value:
-                if item not in config[key]:
+                if item not in existing:
                     config[key].append(item)
+                    existing.add(item)
                     updated = True
 
     # Read the connection string from environment if available.
@@ -128,7 +163,9 @@ def load_config(config_file: str = CONFIG_FILE) -> dict:
         config["recursive_crawl"] = False
 
     if updated:
-        with open(config_file, "w") as f:
-            yaml.dump(config, f)
+        dump_config(config, config_file)
         logger.info(f"Updated configuration file {config_file} with missing keys.")
+        mtime_ns = os.stat(config_file).st_mtime_ns
+    if mtime_ns is not None:
+        _CONFIG_CACHE[(config_file, mtime_ns)] = config
     return config
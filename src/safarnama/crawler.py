@@ -2,26 +2,81 @@ import os
 import re
 import time
 import json
+import asyncio
+import hashlib
 import httpx
 import urllib.robotparser
 import xml.etree.ElementTree as ET
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
+from xml.sax.saxutils import escape
 from loguru import logger
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from safarnama.html_cleaner import HTMLCleaner
 from safarnama.db import DBHandler
 
+try:
+    # orjson parses large LLM payloads several times faster than stdlib json.
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+try:
+    # HTTP/2 support in httpx needs the optional h2 package.
+    import h2  # noqa: F401
+
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    # lxml's C parser is several times faster than the stdlib html.parser.
+    import lxml  # noqa: F401
+
+    _BS4_PARSER = "lxml"
+except ImportError:
+    _BS4_PARSER = "html.parser"
+
+try:
+    # selectolax beats even bs4+lxml by an order of magnitude for the narrow
+    # "pull hrefs out of a page" case the crawl loop needs.
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+# The crawl loop only ever reads anchors (and images when find_images is
+# on); strainers keep BeautifulSoup from building tree objects for the rest
+# of the document.
+_A_STRAINER = SoupStrainer("a", href=True)
+_A_IMG_STRAINER = SoupStrainer(["a", "img"])
+
+
+@lru_cache(maxsize=4096)
+def _netloc(url: str) -> str:
+    return urlparse(url).netloc
+
+
+# Advertise compression explicitly and identify the crawler; brotli is left
+# out because decoding it needs an extra package.
+_DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "safarnama",
+}
+
 
 class SiteCrawler:
     def __init__(self, config: dict) -> None:
         self.config = config
         self.base_url = config.get("base_url")
+        self._base_netloc = urlparse(self.base_url).netloc if self.base_url else ""
         self.max_depth = config.get("max_depth", 2)
         self.delay = config.get("delay", 1)
+        self.max_page_size = config.get("max_page_size", 10485760)
         self.llm_config = config.get("llm", {})
         self.accepted_content_types = config.get("accepted_content_types")
         self.binary_extensions = config.get("binary_extensions", [])
+        self._binary_suffixes = tuple(e.lower() for e in self.binary_extensions)
         self.download_binaries = config.get("download_binaries", False)
         self.download_specific_binaries = config.get("download_specific_binaries", [])
         self.find_images = config.get("find_images", False)
@@ -31,11 +86,41 @@ class SiteCrawler:
         self.depth_settings = config.get("depth_settings", {})
         self.url_settings = config.get("url_settings", {})
 
+        # Precompile the configured patterns once so the per-link checks in
+        # add_url/crawl do not recompile them for every URL.
+        self._exclude_url_res = [re.compile(p) for p in self.exclude_url_patterns]
+        self._exclude_url_re = self._fuse_patterns(self.exclude_url_patterns)
+        self._exclude_content_re = self._fuse_patterns(
+            self.exclude_content_patterns, re.IGNORECASE
+        )
+        self._url_settings_compiled = [
+            (re.compile(p), settings) for p, settings in self.url_settings.items()
+        ]
+        self._compiled_pattern_cache = {}
+        self._fused_pattern_cache = {}
+        self._settings_cache = {}
+
         connection_string = config.get("connection_string", "sqlite:///python.db")
         self.db = DBHandler(connection_string)
-        self.rp = None
-        if self.respect_robots:
-            self.rp = self.get_robots_parser(self.base_url)
+        # robots.txt parsers are fetched lazily on the first is_allowed call
+        # and cached per host, so construction never blocks on the network
+        # and multi-host crawls consult the right robots file.
+        self._rp_cache = {}
+        # can_fetch walks the rule list linearly; crawls revisit the same
+        # (user_agent, url) pairs rarely but share long path prefixes, so a
+        # small memo table skips repeat rule scans outright.
+        self._can_fetch = lru_cache(maxsize=4096)(self._can_fetch_uncached)
+        # URLs already handed to the frontier; primed from the DB so repeat
+        # sightings of a link never round-trip to the database.
+        self._seen = set(self.db.get_all_urls())
+        # One pooled client for every synchronous request the crawler makes
+        # (downloads, LLM calls), so connections and TLS sessions are reused.
+        self.http = httpx.Client(
+            http2=_HTTP2,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+            headers=_DEFAULT_HEADERS,
+        )
         self.html_cleaner = HTMLCleaner
 
     def get_robots_parser(self, base_url: str) -> urllib.robotparser.RobotFileParser:
@@ -49,38 +134,76 @@ class SiteCrawler:
             logger.error(f"Error reading robots.txt from {robots_url}: {e}")
         return rp
 
+    def _can_fetch_uncached(self, user_agent: str, url: str) -> bool:
+        netloc = urlparse(url).netloc
+        rp = self._rp_cache.get(netloc)
+        if rp is None:
+            rp = self.get_robots_parser(url)
+            self._rp_cache[netloc] = rp
+        return rp.can_fetch(user_agent, url)
+
     def is_allowed(self, url: str, user_agent: str = "*") -> bool:
         if not self.respect_robots:
             return True
-        return self.rp.can_fetch(user_agent, url)
+        return self._can_fetch(user_agent, url)
 
     def is_binary_url(self, url: str) -> bool:
-        for ext in self.binary_extensions:
-            if url.lower().endswith(ext):
-                return True
-        return False
+        if not self._binary_suffixes:
+            return False
+        return url.lower().endswith(self._binary_suffixes)
+
+    @staticmethod
+    def _fuse_patterns(patterns: list, flags: int = 0):
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{p})" for p in patterns), flags)
+
+    def _compile_patterns(self, patterns: list) -> list:
+        key = tuple(patterns)
+        compiled = self._compiled_pattern_cache.get(key)
+        if compiled is None:
+            compiled = [re.compile(p) for p in patterns]
+            self._compiled_pattern_cache[key] = compiled
+        return compiled
+
+    def _fused_pattern(self, patterns: list, flags: int = 0):
+        key = (tuple(patterns), flags)
+        if key not in self._fused_pattern_cache:
+            self._fused_pattern_cache[key] = self._fuse_patterns(patterns, flags)
+        return self._fused_pattern_cache[key]
 
     def should_exclude_url(self, url: str, exclude_patterns: list = None) -> bool:
-        patterns = (
-            exclude_patterns
-            if exclude_patterns is not None
-            else self.exclude_url_patterns
-        )
-        for pattern in patterns:
-            if re.search(pattern, url):
-                logger.info(f"Excluding URL {url} due to pattern match: {pattern}")
-                return True
-        return False
+        if exclude_patterns is not None:
+            fused = self._fused_pattern(exclude_patterns)
+            compiled = self._compile_patterns(exclude_patterns)
+        else:
+            fused = self._exclude_url_re
+            compiled = self._exclude_url_res
+        if fused is None or not fused.search(url):
+            return False
+        # Cold path: only identify which pattern matched for the log message.
+        for pattern in compiled:
+            if pattern.search(url):
+                logger.info(
+                    f"Excluding URL {url} due to pattern match: {pattern.pattern}"
+                )
+                break
+        return True
 
     def get_url_specific_settings(self, url: str) -> dict:
         if url in self.url_settings:
             return self.url_settings[url]
-        for pattern, settings in self.url_settings.items():
-            if re.search(pattern, url):
+        for pattern, settings in self._url_settings_compiled:
+            if pattern.search(url):
                 return settings
         return {}
 
     def merge_settings(self, url: str, depth: int) -> dict:
+        # add_url and the crawl loop both resolve settings for the same URL;
+        # memoize so the dict merge and url_settings scan run once per pair.
+        cached = self._settings_cache.get((url, depth))
+        if cached is not None:
+            return cached
         effective = {
             "download_binaries": self.download_binaries,
             "download_specific_binaries": self.download_specific_binaries,
@@ -90,6 +213,7 @@ class SiteCrawler:
         }
         effective.update(self.depth_settings.get(depth, {}))
         effective.update(self.get_url_specific_settings(url))
+        self._settings_cache[(url, depth)] = effective
         return effective
 
     def download_file(self, url: str, dest_folder: str = "downloads") -> None:
@@ -98,7 +222,7 @@ class SiteCrawler:
             local_filename = os.path.join(
                 dest_folder, os.path.basename(urlparse(url).path)
             )
-            with httpx.stream("GET", url) as r:
+            with self.http.stream("GET", url) as r:
                 with open(local_filename, "wb") as f:
                     for chunk in r.iter_bytes():
                         f.write(chunk)
@@ -107,8 +231,15 @@ class SiteCrawler:
             logger.error(f"Failed to download file {url}: {e}")
 
     def add_url(
-        self, url: str, depth: int, status: str = "to_visit", content_type: str = None
+        self,
+        url: str,
+        depth: int,
+        status: str = "to_visit",
+        content_type: str = None,
+        batch: list = None,
     ) -> None:
+        if url in self._seen:
+            return
         effective_settings = self.merge_settings(url, depth)
         if self.should_exclude_url(
             url, effective_settings.get("exclude_url_patterns", [])
@@ -116,6 +247,7 @@ class SiteCrawler:
             return
 
         if self.is_binary_url(url):
+            self._seen.add(url)
             ext = os.path.splitext(urlparse(url).path)[1].lower()
             if effective_settings.get("download_binaries") or (
                 effective_settings.get("download_specific_binaries")
@@ -128,20 +260,46 @@ class SiteCrawler:
                 self.update_url_status(url, "ignored", "binary")
             return
 
-        self.db.insert_url(url, depth, status, content_type)
+        self._seen.add(url)
+        if batch is not None:
+            batch.append(
+                {
+                    "url": url,
+                    "depth": depth,
+                    "status": status,
+                    "content_type": content_type,
+                }
+            )
+        else:
+            self.db.insert_url(url, depth, status, content_type)
+
+    def add_urls(self, url_depth_pairs) -> int:
+        """Queue many (url, depth) pairs with one bulk insert; returns the
+        number of URLs actually enqueued after filtering."""
+        batch: list = []
+        for url, depth in url_depth_pairs:
+            self.add_url(url, depth, batch=batch)
+        self.db.insert_urls(batch)
+        return len(batch)
 
     def update_url_status(
         self, url: str, status: str, content_type: str = None
     ) -> None:
         self.db.update_url_status(url, status, content_type)
 
-    def update_page_info(self, url: str, summary: str, tags: str) -> None:
-        self.db.update_page_info(url, summary, tags)
+    def update_page_info(
+        self, url: str, summary: str, tags: str, content_hash: str = None
+    ) -> None:
+        self.db.update_page_info(url, summary, tags, content_hash)
 
     def get_next_url(self) -> tuple:
         return self.db.get_next_url(self.max_depth)
 
     def get_summary_and_tags(self, text: str, effective_settings: dict = None) -> tuple:
+        # Without an endpoint there is nothing to summarize against; bail out
+        # before paying for the regex cleaning pass.
+        if not self.llm_config.get("endpoint"):
+            return "", []
         exclude_patterns = (
             effective_settings.get(
                 "exclude_content_patterns", self.exclude_content_patterns
@@ -149,15 +307,36 @@ class SiteCrawler:
             if effective_settings
             else self.exclude_content_patterns
         )
+        if exclude_patterns is self.exclude_content_patterns:
+            exclude_re = self._exclude_content_re
+        else:
+            exclude_re = self._fused_pattern(exclude_patterns, re.IGNORECASE)
         cleaned_text = self.html_cleaner.clean_html(
-            text, clean_svg=True, clean_base64=True, exclude_patterns=exclude_patterns
+            text, clean_svg=True, clean_base64=True, compiled_exclude=exclude_re
         )
+        # Identical cleaned content (boilerplate pages, repeat crawls) should
+        # not pay for another LLM inference.
+        content_hash = hashlib.blake2b(
+            cleaned_text.encode("utf-8"), digest_size=16
+        ).hexdigest()
+        cached_summary, cached_tags = self.db.get_llm_cache(content_hash)
+        if cached_summary is not None:
+            logger.info(f"LLM cache hit for content hash {content_hash}")
+            return cached_summary, json.loads(cached_tags) if cached_tags else []
         prompt_template = self.llm_config.get("llm_prompt_template", "")
         system_prompt = self.llm_config.get(
             "system_prompt",
             "You are a helpful assistant that summarizes webpages and extracts tags.",
         )
-        prompt = f"{prompt_template}\n\n{cleaned_text}"
+        # Cap the page text so huge documents don't blow up prompt memory or
+        # LLM cost; ~4 characters per token is a safe upper bound.
+        max_chars = self.llm_config.get("max_tokens", 200000) * 4
+        if len(cleaned_text) > max_chars:
+            logger.info(
+                f"Truncating cleaned text from {len(cleaned_text)} to {max_chars} characters"
+            )
+            cleaned_text = cleaned_text[:max_chars]
+        prompt = "\n\n".join((prompt_template, cleaned_text))
         payload = {
             "model": self.llm_config.get("model", ""),
             "messages": [
@@ -179,11 +358,11 @@ class SiteCrawler:
             try:
                 endpoint = self.llm_config.get("endpoint", "")
                 logger.info(f"Sending request to LLM endpoint: {endpoint}")
-                response = httpx.post(
+                response = self.http.post(
                     endpoint, json=payload, headers=headers, timeout=timeout_config
                 )
                 response.raise_for_status()
-                response_json = response.json()
+                response_json = json_loads(response.content)
                 if "error" in response_json:
                     logger.error(f"LLM returned error: {response_json['error']}")
                     return "", []
@@ -192,13 +371,13 @@ class SiteCrawler:
                     logger.error(f"LLM response missing 'choices': {response_json}")
                     return "", []
                 content = choices[0]["message"]["content"]
-                if content.startswith("```json"):
-                    content = content[len("```json") :].strip()
-                if content.endswith("```"):
-                    content = content[:-3].strip()
-                result = json.loads(content)
+                content = (
+                    content.removeprefix("```json").strip().removesuffix("```").strip()
+                )
+                result = json_loads(content)
                 summary = result.get("summary", "")
                 tags = result.get("tags", [])
+                self.db.set_llm_cache(content_hash, summary, json.dumps(tags))
                 return summary, tags
             except httpx.TimeoutException as e:
                 logger.error(f"LLM request timeout on attempt {attempt+1}: {e}")
@@ -208,43 +387,102 @@ class SiteCrawler:
                 break
         return "", []
 
+    def build_sitemap_xml(self, urls: set) -> str:
+        # The sitemap schema is fixed, so emit the XML directly instead of
+        # allocating two Element objects per URL.
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        ]
+        parts.extend(f"<url><loc>{escape(url)}</loc></url>" for url in urls)
+        parts.append("</urlset>")
+        return "".join(parts)
+
     def generate_sitemap(self, urls: set) -> ET.ElementTree:
-        urlset = ET.Element(
-            "urlset", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
-        )
-        for url in urls:
-            url_elem = ET.SubElement(urlset, "url")
-            loc = ET.SubElement(url_elem, "loc")
-            loc.text = url
-        return ET.ElementTree(urlset)
+        return ET.ElementTree(ET.fromstring(self.build_sitemap_xml(urls)))
 
-    def crawl(self) -> set:
-        self.add_url(self.base_url, 0)
-        visited_urls = set()
-        with httpx.Client(timeout=10) as client:
-            while True:
-                current_url, depth = self.get_next_url()
-                if not current_url:
-                    break
-                effective_settings = self.merge_settings(current_url, depth)
-                if self.should_exclude_url(
-                    current_url, effective_settings.get("exclude_url_patterns", [])
-                ):
-                    self.update_url_status(current_url, "ignored")
-                    continue
-                if self.is_binary_url(current_url):
-                    continue
-                logger.info(f"Processing {current_url} at depth {depth}")
-                if not self.is_allowed(current_url):
-                    logger.info(f"Skipping disallowed URL: {current_url}")
-                    self.update_url_status(current_url, "ignored")
-                    continue
-                try:
-                    response = client.get(current_url)
-                except Exception as e:
-                    logger.error(f"Error fetching {current_url}: {e}")
-                    self.update_url_status(current_url, "ignored")
-                    continue
+    def write_sitemap(self, urls: set, path: str = "sitemap.xml") -> None:
+        # Stream straight to the file so a large crawl never holds the whole
+        # document (or an element tree of it) in memory.
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            )
+            for url in urls:
+                f.write(f"  <url><loc>{escape(url)}</loc></url>\n")
+            f.write("</urlset>\n")
+
+    async def _respect_delay(self, netloc: str) -> None:
+        """Space requests to the same host at least self.delay seconds apart."""
+        if not self.delay:
+            return
+        lock = self._host_locks.setdefault(netloc, asyncio.Lock())
+        async with lock:
+            wait = self.delay - (time.monotonic() - self._host_last_fetch.get(netloc, 0.0))
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._host_last_fetch[netloc] = time.monotonic()
+
+    @staticmethod
+    def _extract_links(body: str, want_images: bool) -> tuple:
+        """Return (anchor hrefs, image srcs) from a page body.
+
+        Uses selectolax when installed and falls back to strained
+        BeautifulSoup otherwise.
+        """
+        if _SelectolaxParser is not None:
+            tree = _SelectolaxParser(body)
+            hrefs = [
+                href
+                for node in tree.css("a[href]")
+                if (href := node.attributes.get("href"))
+            ]
+            srcs = (
+                [
+                    src
+                    for node in tree.css("img[src]")
+                    if (src := node.attributes.get("src"))
+                ]
+                if want_images
+                else []
+            )
+        else:
+            strainer = _A_IMG_STRAINER if want_images else _A_STRAINER
+            soup = BeautifulSoup(body, _BS4_PARSER, parse_only=strainer)
+            hrefs = [node.get("href") for node in soup.find_all("a", href=True)]
+            srcs = (
+                [node.get("src") for node in soup.find_all("img", src=True)]
+                if want_images
+                else []
+            )
+        return hrefs, srcs
+
+    async def _process_url(
+        self,
+        client: httpx.AsyncClient,
+        current_url: str,
+        depth: int,
+        visited_urls: set,
+    ) -> None:
+        effective_settings = self.merge_settings(current_url, depth)
+        if self.should_exclude_url(
+            current_url, effective_settings.get("exclude_url_patterns", [])
+        ):
+            self.update_url_status(current_url, "ignored")
+            return
+        if self.is_binary_url(current_url):
+            return
+        logger.info(f"Processing {current_url} at depth {depth}")
+        if not self.is_allowed(current_url):
+            logger.info(f"Skipping disallowed URL: {current_url}")
+            self.update_url_status(current_url, "ignored")
+            return
+        await self._respect_delay(_netloc(current_url))
+        try:
+            # Stream so the headers can be inspected before the body
+            # is downloaded; unsupported content is never read.
+            async with client.stream("GET", current_url) as response:
                 content_type = (
                     response.headers.get("Content-Type", "").split(";")[0].strip()
                 )
@@ -253,12 +491,47 @@ class SiteCrawler:
                         f"Ignoring {current_url}: unsupported content type '{content_type}'"
                     )
                     self.update_url_status(current_url, "ignored", content_type)
-                    continue
-                self.update_url_status(current_url, "visited", content_type)
-                visited_urls.add(current_url)
-                if "html" in content_type.lower():
-                    summary, tags = self.get_summary_and_tags(
-                        response.text, effective_settings
+                    return
+                content_length = response.headers.get("Content-Length")
+                if (
+                    self.max_page_size
+                    and content_length
+                    and int(content_length) > self.max_page_size
+                ):
+                    logger.info(
+                        f"Ignoring {current_url}: body of {content_length} bytes "
+                        f"exceeds max_page_size {self.max_page_size}"
+                    )
+                    self.update_url_status(current_url, "ignored", content_type)
+                    return
+                body_bytes = await response.aread()
+                # Decode once, explicitly: response.text falls back to
+                # charset detection, which rescans the whole body.
+                encoding = response.charset_encoding or "utf-8"
+                body = body_bytes.decode(encoding, errors="replace")
+        except Exception as e:
+            logger.error(f"Error fetching {current_url}: {e}")
+            self.update_url_status(current_url, "ignored")
+            return
+        self.update_url_status(current_url, "visited", content_type)
+        visited_urls.add(current_url)
+        if "html" in content_type.lower():
+            if self.llm_config.get("endpoint"):
+                # On repeat crawls, skip the LLM entirely when the page body
+                # is byte-identical to what was summarized last time.
+                body_hash = hashlib.blake2b(
+                    body.encode("utf-8"), digest_size=16
+                ).hexdigest()
+                old_hash, old_summary, old_tags = self.db.get_page_info(current_url)
+                if old_hash == body_hash and old_summary:
+                    logger.info(
+                        f"Content unchanged for {current_url}; reusing stored summary"
+                    )
+                else:
+                    # The LLM call is blocking httpx with retries; keep it off
+                    # the event loop so other fetches can proceed.
+                    summary, tags = await asyncio.to_thread(
+                        self.get_summary_and_tags, body, effective_settings
                     )
                     logger.info(f"Summary for {current_url}: {summary}")
                     logger.info(f"Tags for {current_url}: {tags}")
@@ -268,31 +541,68 @@ class SiteCrawler:
                         )
                         for tag in tags
                     )
-                    self.update_page_info(current_url, summary, tags_str)
-                    if effective_settings.get("find_images", self.find_images):
-                        soup = BeautifulSoup(response.text, "html.parser")
-                        for img in soup.find_all("img", src=True):
-                            img_url = urljoin(current_url, img.get("src"))
-                            logger.info(f"Found image: {img_url}")
-                            if effective_settings.get(
-                                "download_binaries", self.download_binaries
-                            ):
-                                self.download_file(img_url, dest_folder="images")
-                    if self.config.get("recursive_crawl", True):
-                        soup = BeautifulSoup(response.text, "html.parser")
-                        for link in soup.find_all("a", href=True):
-                            href = link.get("href")
-                            if href.startswith("#") or not href.strip():
-                                continue
-                            absolute_url = urljoin(current_url, href)
-                            if (
-                                urlparse(absolute_url).netloc
-                                == urlparse(self.base_url).netloc
-                            ):
-                                next_depth = depth + 1
-                                self.add_url(absolute_url, next_depth)
-                time.sleep(self.delay)
+                    # An empty summary means the LLM call failed; leave the
+                    # hash unset so the next crawl tries again.
+                    self.update_page_info(
+                        current_url,
+                        summary,
+                        tags_str,
+                        body_hash if summary else None,
+                    )
+            find_images = effective_settings.get("find_images", self.find_images)
+            recursive_crawl = self.config.get("recursive_crawl", True)
+            hrefs, srcs = [], []
+            if find_images or recursive_crawl:
+                hrefs, srcs = self._extract_links(body, find_images)
+            if find_images:
+                for src in srcs:
+                    img_url = urljoin(current_url, src)
+                    logger.info(f"Found image: {img_url}")
+                    if effective_settings.get(
+                        "download_binaries", self.download_binaries
+                    ):
+                        self.download_file(img_url, dest_folder="images")
+            if recursive_crawl:
+                new_urls = []
+                for href in hrefs:
+                    if href.startswith("#") or not href.strip():
+                        continue
+                    absolute_url = urljoin(current_url, href)
+                    if _netloc(absolute_url) == self._base_netloc:
+                        next_depth = depth + 1
+                        self.add_url(absolute_url, next_depth, batch=new_urls)
+                self.db.insert_urls(new_urls)
+
+    async def crawl_async(self) -> set:
+        self.add_url(self.base_url, 0)
+        visited_urls = set()
+        concurrency = self.config.get("concurrency", 5)
+        semaphore = asyncio.Semaphore(concurrency)
+        self._host_locks = {}
+        self._host_last_fetch = {}
+
+        async def process_bounded(url: str, depth: int) -> None:
+            async with semaphore:
+                await self._process_url(client, url, depth, visited_urls)
+
+        async with httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+            headers=_DEFAULT_HEADERS,
+        ) as client:
+            while True:
+                batch = self.db.get_next_urls(self.max_depth, limit=concurrency)
+                if not batch:
+                    break
+                await asyncio.gather(
+                    *(process_bounded(url, depth) for url, depth in batch)
+                )
         return visited_urls
 
+    def crawl(self) -> set:
+        return asyncio.run(self.crawl_async())
+
     def close(self) -> None:
+        self.http.close()
         self.db.close()
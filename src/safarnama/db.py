@@ -1,14 +1,40 @@
 from datetime import datetime, timedelta  # Fixed: import timedelta from datetime
-from sqlalchemy import create_engine, Column, String, Integer, Text, Float, DateTime
+from sqlalchemy import (
+    create_engine,
+    Column,
+    String,
+    Integer,
+    Text,
+    Float,
+    DateTime,
+    Index,
+    or_,
+    update,
+    func,
+    event,
+    inspect,
+    text,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from loguru import logger
 from typing import List
 
 Base = declarative_base()
 
 
+def _sqlite_fast_pragmas(dbapi_connection, connection_record):
+    # WAL avoids an fsync per commit and NORMAL is safe under WAL; together
+    # they take commits from ~1ms of disk IO each to near-free.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
 # ------------------------------
 # URL Model for the Crawler
 # ------------------------------
@@ -20,6 +46,11 @@ class URL(Base):
     content_type = Column(String)
     summary = Column(Text)
     tags = Column(Text)
+    content_hash = Column(String)
+
+
+# Covers the frontier poll in get_next_url (status filter + depth ordering).
+Index("ix_urls_status_depth", URL.status, URL.depth)
 
 
 # ------------------------------
@@ -45,61 +76,142 @@ class Instance(Base):
     sleep_until = Column(DateTime)
 
 
+# Lets the availability query in get_available_instances walk the index in
+# priority order instead of scanning and sorting.
+Index("ix_instances_priority_sleep", Instance.priority, Instance.sleep_until)
+
+
+# ------------------------------
+# LLM Result Cache
+# ------------------------------
+class LLMCache(Base):
+    __tablename__ = "llm_cache"
+    content_hash = Column(String, primary_key=True)
+    summary = Column(Text)
+    tags = Column(Text)
+
+
 # ------------------------------
 # Unified Database Handler
 # ------------------------------
 class DBHandler:
     def __init__(self, connection_string: str):
         self.engine = create_engine(connection_string)
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", _sqlite_fast_pragmas)
         Base.metadata.create_all(self.engine)
-        self.Session = sessionmaker(bind=self.engine)
+        self._migrate_schema()
+        # One long-lived session per thread instead of open/commit/close per
+        # statement. Sessions are not thread-safe, and the crawler reaches the
+        # DB both from the event loop and from to_thread workers (LLM path),
+        # so the registry hands each thread its own.
+        self.Session = scoped_session(sessionmaker(bind=self.engine))
+        # Dialect-specific INSERT with ON CONFLICT DO NOTHING, so duplicate
+        # URLs are dropped server-side instead of via exception/rollback.
+        if self.engine.dialect.name == "postgresql":
+            self._insert = pg_insert
+        else:
+            self._insert = sqlite_insert
+
+    def _migrate_schema(self):
+        """Add columns that create_all won't: it never alters existing tables,
+        so databases made before the column existed need an explicit ALTER."""
+        try:
+            columns = {col["name"] for col in inspect(self.engine).get_columns("urls")}
+            if "content_hash" not in columns:
+                with self.engine.begin() as conn:
+                    conn.execute(text("ALTER TABLE urls ADD COLUMN content_hash TEXT"))
+                logger.info("Added missing urls.content_hash column.")
+            # create_all also skips indexes on tables that already exist, so
+            # databases from before an index was declared never get it.
+            for table in Base.metadata.tables.values():
+                for index in table.indexes:
+                    index.create(self.engine, checkfirst=True)
+        except SQLAlchemyError as e:
+            logger.error(f"Error migrating schema: {e}")
+
+    @property
+    def session(self):
+        """The calling thread's session from the scoped registry."""
+        return self.Session()
 
     # ----- Methods for URL table -----
     def insert_url(self, url: str, depth: int, status: str, content_type: str = None):
-        session = self.Session()
         try:
-            record = URL(url=url, depth=depth, status=status, content_type=content_type)
-            session.add(record)
-            session.commit()
+            stmt = (
+                self._insert(URL)
+                .values(url=url, depth=depth, status=status, content_type=content_type)
+                .on_conflict_do_nothing(index_elements=["url"])
+            )
+            self.session.execute(stmt)
+            self.session.commit()
         except SQLAlchemyError as e:
-            session.rollback()
+            self.session.rollback()
             logger.error(f"Error inserting URL {url}: {e}")
-        finally:
-            session.close()
+
+    def insert_urls(self, rows: List[dict]):
+        """Insert many URL rows in a single transaction, skipping known URLs."""
+        if not rows:
+            return
+        try:
+            # First occurrence wins when the same URL appears twice in a batch.
+            unique_rows = {row["url"]: row for row in reversed(rows)}
+            stmt = (
+                self._insert(URL)
+                .values(list(unique_rows.values()))
+                .on_conflict_do_nothing(index_elements=["url"])
+            )
+            self.session.execute(stmt)
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error bulk inserting {len(rows)} URLs: {e}")
 
     def update_url_status(self, url: str, status: str, content_type: str = None):
-        session = self.Session()
         try:
-            record = session.query(URL).filter_by(url=url).first()
+            record = self.session.query(URL).filter_by(url=url).first()
             if record:
                 record.status = status
                 record.content_type = content_type
-                session.commit()
+                self.session.commit()
         except SQLAlchemyError as e:
-            session.rollback()
+            self.session.rollback()
             logger.error(f"Error updating URL status for {url}: {e}")
-        finally:
-            session.close()
 
-    def update_page_info(self, url: str, summary: str, tags: str):
-        session = self.Session()
+    def update_page_info(
+        self, url: str, summary: str, tags: str, content_hash: str = None
+    ):
         try:
-            record = session.query(URL).filter_by(url=url).first()
+            record = self.session.query(URL).filter_by(url=url).first()
             if record:
                 record.summary = summary
                 record.tags = tags
-                session.commit()
+                if content_hash is not None:
+                    record.content_hash = content_hash
+                self.session.commit()
         except SQLAlchemyError as e:
-            session.rollback()
+            self.session.rollback()
             logger.error(f"Error updating page info for {url}: {e}")
-        finally:
-            session.close()
+
+    def get_page_info(self, url: str) -> tuple:
+        """Return (content_hash, summary, tags) for a URL, or (None, None, None)."""
+        try:
+            record = (
+                self.session.query(URL.content_hash, URL.summary, URL.tags)
+                .filter(URL.url == url)
+                .first()
+            )
+            if record:
+                return record.content_hash, record.summary, record.tags
+            return None, None, None
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching page info for {url}: {e}")
+            return None, None, None
 
     def get_next_url(self, max_depth: int) -> tuple:
-        session = self.Session()
         try:
             record = (
-                session.query(URL)
+                self.session.query(URL.url, URL.depth)
                 .filter(URL.status == "to_visit", URL.depth <= max_depth)
                 .order_by(URL.depth)
                 .first()
@@ -111,12 +223,59 @@ class DBHandler:
         except SQLAlchemyError as e:
             logger.error(f"Error fetching next URL: {e}")
             return None, None
-        finally:
-            session.close()
+
+    def get_all_urls(self) -> List[str]:
+        try:
+            return [url for (url,) in self.session.query(URL.url).all()]
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching known URLs: {e}")
+            return []
+
+    def get_next_urls(self, max_depth: int, limit: int) -> List[tuple]:
+        try:
+            records = (
+                self.session.query(URL.url, URL.depth)
+                .filter(URL.status == "to_visit", URL.depth <= max_depth)
+                .order_by(URL.depth)
+                .limit(limit)
+                .all()
+            )
+            return [(record.url, record.depth) for record in records]
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching next URLs: {e}")
+            return []
+
+    # ----- Methods for the LLM cache table -----
+    def get_llm_cache(self, content_hash: str) -> tuple:
+        try:
+            record = (
+                self.session.query(LLMCache)
+                .filter_by(content_hash=content_hash)
+                .first()
+            )
+            if record:
+                return record.summary, record.tags
+            return None, None
+        except SQLAlchemyError as e:
+            logger.error(f"Error reading LLM cache for {content_hash}: {e}")
+            return None, None
+
+    def set_llm_cache(self, content_hash: str, summary: str, tags: str):
+        try:
+            stmt = (
+                self._insert(LLMCache)
+                .values(content_hash=content_hash, summary=summary, tags=tags)
+                .on_conflict_do_nothing(index_elements=["content_hash"])
+            )
+            self.session.execute(stmt)
+            self.session.commit()
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            logger.error(f"Error writing LLM cache for {content_hash}: {e}")
 
     # ----- Methods for Instances table (used by searcher) -----
     def upsert_instance(self, instance: dict, url: str):
-        session = self.Session()
+        session = self.session
         try:
             record = session.query(Instance).filter_by(url=url).first()
             version = instance.get("version")
@@ -187,11 +346,9 @@ class DBHandler:
         except SQLAlchemyError as e:
             session.rollback()
             logger.error(f"Error upserting instance {url}: {e}")
-        finally:
-            session.close()
 
     def update_sleep(self, url: str, sleep_seconds: int):
-        session = self.Session()
+        session = self.session
         try:
             record = session.query(Instance).filter_by(url=url).first()
             if record:
@@ -202,11 +359,9 @@ class DBHandler:
         except SQLAlchemyError as e:
             session.rollback()
             logger.error(f"Error updating sleep for instance {url}: {e}")
-        finally:
-            session.close()
 
     def clear_sleep(self, url: str):
-        session = self.Session()
+        session = self.session
         try:
             record = session.query(Instance).filter_by(url=url).first()
             if record:
@@ -215,30 +370,41 @@ class DBHandler:
         except SQLAlchemyError as e:
             session.rollback()
             logger.error(f"Error clearing sleep for instance {url}: {e}")
-        finally:
-            session.close()
 
     def update_all_priorities(self):
-        session = self.Session()
         try:
-            records = session.query(Instance).all()
-            for record in records:
-                new_priority = 100 - (record.uptime or 0)
-                record.priority = new_priority
-            session.commit()
+            self.session.execute(
+                update(Instance).values(
+                    priority=100 - func.coalesce(Instance.uptime, 0)
+                )
+            )
+            self.session.commit()
         except SQLAlchemyError as e:
-            session.rollback()
+            self.session.rollback()
             logger.error(f"Error updating priorities: {e}")
-        finally:
-            session.close()
+
+    def has_sleeping_instances(self) -> bool:
+        try:
+            now = datetime.utcnow()
+            record = (
+                self.session.query(Instance.id)
+                .filter(Instance.sleep_until > now)
+                .first()
+            )
+            return record is not None
+        except SQLAlchemyError as e:
+            logger.error(f"Error checking for sleeping instances: {e}")
+            return True
 
     def get_available_instances(self) -> List[Instance]:
-        session = self.Session()
+        session = self.session
         try:
             now = datetime.utcnow()
             records = (
                 session.query(Instance)
-                .filter((Instance.sleep_until is None) | (Instance.sleep_until <= now))
+                .filter(
+                    or_(Instance.sleep_until.is_(None), Instance.sleep_until <= now)
+                )
                 .order_by(Instance.priority.asc())
                 .all()
             )
@@ -246,8 +412,6 @@ class DBHandler:
         except SQLAlchemyError as e:
             logger.error(f"Error fetching available instances: {e}")
             return []
-        finally:
-            session.close()
 
     def close(self):
-        pass
+        self.Session.remove()
@@ -2,26 +2,33 @@ import re
 
 
 class HTMLCleaner:
-    SCRIPT_PATTERN = r"<[ ]*script.*?\/[ ]*script[ ]*>"
-    STYLE_PATTERN = r"<[ ]*style.*?\/[ ]*style[ ]*>"
-    META_PATTERN = r"<[ ]*meta.*?>"
-    COMMENT_PATTERN = r"<[ ]*!--.*?--[ ]*>"
-    LINK_PATTERN = r"<[ ]*link.*?>"
-    BASE64_IMG_PATTERN = r'<img[^>]+src="data:image/[^;]+;base64,[^"]+"[^>]*>'
-    SVG_PATTERN = r"(<svg[^>]*>)(.*?)(<\/svg>)"
+    # Compiled once at import; clean_html runs for every crawled page and
+    # must not re-resolve these patterns per call.
+    # script/style/meta/comment/link removal fused into one alternation so a
+    # multi-MB page is scanned (and reallocated) once instead of five times.
+    # meta/link use a negated class instead of a lazy dot so a missing '>'
+    # can never send the engine backtracking across the whole document.
+    STRIP_RE = re.compile(
+        r"<\s*script\b.*?<\/\s*script\s*>"
+        r"|<\s*style\b.*?<\/\s*style\s*>"
+        r"|<\s*meta\b[^>]*>"
+        r"|<!--.*?-->"
+        r"|<\s*link\b[^>]*>",
+        re.IGNORECASE | re.DOTALL,
+    )
+    BASE64_IMG_RE = re.compile(r'<img[^>]+src="data:image/[^;]+;base64,[^"]+"[^>]*>')
+    SVG_RE = re.compile(r"(<svg[^>]*>)(.*?)(<\/svg>)", re.DOTALL)
 
     @classmethod
     def replace_svg(cls, html: str, new_content: str = "this is a placeholder") -> str:
-        return re.sub(
-            cls.SVG_PATTERN,
+        return cls.SVG_RE.sub(
             lambda match: f"{match.group(1)}{new_content}{match.group(3)}",
             html,
-            flags=re.DOTALL,
         )
 
     @classmethod
     def replace_base64_images(cls, html: str, new_image_src: str = "#") -> str:
-        return re.sub(cls.BASE64_IMG_PATTERN, f'<img src="{new_image_src}"/>', html)
+        return cls.BASE64_IMG_RE.sub(f'<img src="{new_image_src}"/>', html)
 
     @classmethod
     def clean_html(
@@ -30,30 +37,16 @@ class HTMLCleaner:
         clean_svg: bool = False,
         clean_base64: bool = False,
         exclude_patterns: list = None,
+        compiled_exclude=None,
     ) -> str:
-        html = re.sub(
-            cls.SCRIPT_PATTERN, "", html, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL
-        )
-        html = re.sub(
-            cls.STYLE_PATTERN, "", html, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL
-        )
-        html = re.sub(
-            cls.META_PATTERN, "", html, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL
-        )
-        html = re.sub(
-            cls.COMMENT_PATTERN,
-            "",
-            html,
-            flags=re.IGNORECASE | re.MULTILINE | re.DOTALL,
-        )
-        html = re.sub(
-            cls.LINK_PATTERN, "", html, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL
-        )
+        html = cls.STRIP_RE.sub("", html)
         if clean_svg:
             html = cls.replace_svg(html)
         if clean_base64:
             html = cls.replace_base64_images(html)
-        if exclude_patterns:
+        if compiled_exclude is not None:
+            html = compiled_exclude.sub("", html)
+        elif exclude_patterns:
             for pattern in exclude_patterns:
                 html = re.sub(pattern, "", html, flags=re.IGNORECASE)
         return html
@@ -1,3 +1,5 @@
+import asyncio
+import time
 import httpx
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple, Any
@@ -5,6 +7,18 @@ from loguru import logger
 
 from safarnama.db import DBHandler
 
+try:  # orjson parses result payloads several times faster than stdlib json.
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+try:  # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 without it.
+    import h2  # noqa: F401
+
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
 
 class SearxNGSearcher:
     """
@@ -12,56 +26,146 @@ class SearxNGSearcher:
     selects a healthy instance, and returns search results.
     """
 
+    # How long a loaded instance list stays fresh before retries re-query the DB.
+    INSTANCES_TTL = 30.0
+
     def __init__(self, db: DBHandler, timeout: int = 10, retries: int = 1):
         self.db = db
         self.timeout = timeout
         self.retries = retries
+        # One pooled client for every probe and search, so repeat requests
+        # to the same instance reuse the TCP+TLS connection.
+        self._client = httpx.Client(
+            timeout=timeout,
+            http2=_HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+        self._instances_loaded_at = 0.0
+        # Recent 429 counts per instance, driving exponential backoff when
+        # the server does not advertise Retry-After.
+        self._rate_limit_counts = {}
         self.instances = self.load_instances()
 
     def load_instances(self) -> List:
+        self._instances_loaded_at = time.monotonic()
         return self.db.get_available_instances()
 
     def update_instances(self):
-        self.db.update_all_priorities()
+        # The table-wide priority UPDATE only matters when throttled
+        # instances might be waking up; skip the write otherwise.
+        if self.db.has_sleeping_instances():
+            self.db.update_all_priorities()
         self.instances = self.load_instances()
 
+    def _refresh_instances(self):
+        """Reload the instance list only when it is empty or past its TTL."""
+        if (
+            not self.instances
+            or time.monotonic() - self._instances_loaded_at > self.INSTANCES_TTL
+        ):
+            self.update_instances()
+
+    def probe_all(self) -> dict:
+        """Probe every loaded instance concurrently; maps url to (healthy, message).
+
+        Used by the explicit health command; the search path derives health
+        from the query response itself and never probes.
+        """
+
+        async def _gather():
+            urls = [record.url.rstrip("/") for record in self.instances]
+            results = await asyncio.gather(
+                *(asyncio.to_thread(self.check_instance_health, url) for url in urls)
+            )
+            return dict(zip(urls, results))
+
+        return asyncio.run(_gather())
+
     def search(self, query: str) -> Optional[Tuple[str, Any]]:
         attempt = 0
+        # Instances that failed during this call; perform_search already put
+        # them to sleep in the DB, so later attempts skip them without
+        # waiting for the cached list to expire.
+        failed = set()
         while attempt <= self.retries:
-            self.update_instances()
-            for record in self.instances:
+            self._refresh_instances()
+            candidates = [
+                record
+                for record in self.instances
+                if record.url.rstrip("/") not in failed
+            ]
+            if not candidates and failed:
+                # Every cached instance has failed; the TTL no longer
+                # reflects reality, so pull a fresh availability list.
+                self.update_instances()
+                candidates = [
+                    record
+                    for record in self.instances
+                    if record.url.rstrip("/") not in failed
+                ]
+            for record in candidates:
                 instance_url = record.url.rstrip("/")
                 logger.info(
                     f"Trying instance: {instance_url} (priority: {record.priority})"
                 )
-                healthy, message = self.check_instance_health(instance_url)
-                if not healthy:
-                    logger.info(f"Instance {instance_url} not healthy: {message}")
-                    continue
+                # The query itself doubles as the health check: its response
+                # tells us everything a separate probe round-trip would.
                 result = self.perform_search(instance_url, query)
                 if result is not None:
                     logger.info(f"Success using instance: {instance_url}")
                     return instance_url, result
+                failed.add(instance_url)
             logger.info("No healthy instance found. Retrying...")
             attempt += 1
         return None
 
+    def _rate_limit_seconds(self, instance_url: str, response) -> int:
+        """Sleep length for a 429: the server's Retry-After if given,
+        otherwise exponential backoff on repeat offences."""
+        count = self._rate_limit_counts.get(instance_url, 0)
+        self._rate_limit_counts[instance_url] = count + 1
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(1, int(retry_after))
+            except (TypeError, ValueError):
+                pass
+        return min(3600, 60 * 2**count)
+
     def check_instance_health(
         self, instance_url: str, test_query: str = "test"
     ) -> Tuple[bool, str]:
-        params = {"q": test_query, "format": "json"}
+        # A HEAD probe answers "is it up?" without making the instance run a
+        # real engine sweep; anything inconclusive falls back to the tiny GET.
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(instance_url, params=params)
-                if response.status_code == 429:
-                    self.db.update_sleep(instance_url, 60)
-                    return False, "rate_limited"
-                response.raise_for_status()
-                data = response.json()
-                if not isinstance(data, dict):
-                    raise ValueError("Unexpected JSON structure")
+            response = self._client.head(instance_url)
+            if response.status_code == 429:
+                self.db.update_sleep(
+                    instance_url, self._rate_limit_seconds(instance_url, response)
+                )
+                return False, "rate_limited"
+            if response.is_success or response.is_redirect:
+                self._rate_limit_counts.pop(instance_url, None)
                 self.db.clear_sleep(instance_url)
                 return True, "healthy"
+        except Exception:
+            pass
+
+        params = {"q": test_query, "format": "json"}
+        try:
+            response = self._client.get(instance_url, params=params)
+            if response.status_code == 429:
+                self.db.update_sleep(
+                    instance_url, self._rate_limit_seconds(instance_url, response)
+                )
+                return False, "rate_limited"
+            response.raise_for_status()
+            data = json_loads(response.content)
+            if not isinstance(data, dict):
+                raise ValueError("Unexpected JSON structure")
+            self._rate_limit_counts.pop(instance_url, None)
+            self.db.clear_sleep(instance_url)
+            return True, "healthy"
         except Exception as e:
             self.db.update_sleep(instance_url, 24 * 3600)
             return False, f"error: {e}"
@@ -69,14 +173,22 @@ class SearxNGSearcher:
     def perform_search(self, instance_url: str, query: str) -> Optional[Any]:
         params = {"q": query, "format": "json"}
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(instance_url, params=params)
-                if response.status_code == 429:
-                    self.db.update_sleep(instance_url, 60)
-                    logger.info(f"Instance {instance_url} rate limited.")
-                    return None
-                response.raise_for_status()
-                return response.json()
+            response = self._client.get(instance_url, params=params)
+            if response.status_code == 429:
+                self.db.update_sleep(
+                    instance_url, self._rate_limit_seconds(instance_url, response)
+                )
+                logger.info(f"Instance {instance_url} rate limited.")
+                return None
+            response.raise_for_status()
+            data = json_loads(response.content)
+            self._rate_limit_counts.pop(instance_url, None)
+            self.db.clear_sleep(instance_url)
+            return data
         except Exception as e:
+            self.db.update_sleep(instance_url, 24 * 3600)
             logger.error(f"Error with instance {instance_url}: {e}")
             return None
+
+    def close(self):
+        self._client.close()
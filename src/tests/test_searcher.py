@@ -18,6 +18,9 @@ class DummyDBHandler:
     def update_all_priorities(self):
         pass
 
+    def has_sleeping_instances(self):
+        return False
+
     def update_sleep(self, url, sleep_seconds):
         pass
 
@@ -33,12 +36,20 @@ class TestSearxNGSearcher(unittest.TestCase):
         self.db = DummyDBHandler()
         self.searcher = SearxNGSearcher(self.db, timeout=5, retries=0)
 
+    @patch("httpx.Client.head")
     @patch("httpx.Client.get")
-    def test_check_instance_health_success(self, mock_get):
+    def test_check_instance_health_success(self, mock_get, mock_head):
+        # HEAD is unsupported, so the probe falls back to the GET leg
+        fake_head = MagicMock()
+        fake_head.status_code = 405
+        fake_head.is_success = False
+        fake_head.is_redirect = False
+        mock_head.return_value = fake_head
+
         # Simulate a healthy instance response
         fake_response = MagicMock()
         fake_response.status_code = 200
-        fake_response.json.return_value = {"dummy": "data"}
+        fake_response.content = b'{"dummy": "data"}'
         fake_response.raise_for_status = lambda: None
         mock_get.return_value = fake_response
 
@@ -53,9 +64,9 @@ class TestSearxNGSearcher(unittest.TestCase):
         # Simulate a successful search response with two results
         fake_response = MagicMock()
         fake_response.status_code = 200
-        fake_response.json.return_value = {
-            "results": [{"url": "http://link1"}, {"url": "http://link2"}]
-        }
+        fake_response.content = (
+            b'{"results": [{"url": "http://link1"}, {"url": "http://link2"}]}'
+        )
         fake_response.raise_for_status = lambda: None
         mock_get.return_value = fake_response
 
@@ -64,6 +75,34 @@ class TestSearxNGSearcher(unittest.TestCase):
         self.assertIn("results", result)
         self.assertEqual(len(result["results"]), 2)
 
+    def test_rate_limit_seconds_uses_retry_after(self):
+        fake_response = MagicMock()
+        fake_response.headers = {"Retry-After": "120"}
+        self.assertEqual(
+            self.searcher._rate_limit_seconds("http://fake-instance", fake_response),
+            120,
+        )
+
+    def test_rate_limit_seconds_backs_off_exponentially(self):
+        fake_response = MagicMock()
+        fake_response.headers = {}
+        sleeps = [
+            self.searcher._rate_limit_seconds("http://fake-instance", fake_response)
+            for _ in range(3)
+        ]
+        self.assertEqual(sleeps, [60, 120, 240])
+        # A successful search resets the backoff count.
+        fake_ok = MagicMock()
+        fake_ok.status_code = 200
+        fake_ok.content = b"{}"
+        fake_ok.raise_for_status = lambda: None
+        with patch("httpx.Client.get", return_value=fake_ok):
+            self.searcher.perform_search("http://fake-instance", "query")
+        self.assertEqual(
+            self.searcher._rate_limit_seconds("http://fake-instance", fake_response),
+            60,
+        )
+
     @patch("safarnama.searcher.SearxNGSearcher.check_instance_health")
     @patch("safarnama.searcher.SearxNGSearcher.perform_search")
     def test_search_overall_success(self, mock_perform_search, mock_check_health):
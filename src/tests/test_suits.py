@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 import xml.etree.ElementTree as ET
 from unittest.mock import patch, MagicMock
@@ -5,7 +7,7 @@ from unittest.mock import patch, MagicMock
 import sqlalchemy
 from sqlalchemy.exc import SQLAlchemyError
 
-from safarnama.config import load_config
+from safarnama.config import load_config, clear_config_cache
 from safarnama.html_cleaner import HTMLCleaner
 from safarnama.db import DBHandler
 from safarnama.crawler import SiteCrawler
@@ -33,8 +35,10 @@ class TestHTMLCleaner(unittest.TestCase):
 # -------------------------------
 class TestConfig(unittest.TestCase):
     def test_default_config(self):
-        # Using a non-existent config file so defaults are applied.
-        config = load_config("non_existing_config.yaml")
+        # Using a non-existent config file so defaults are applied; load_config
+        # writes the backfilled file, so keep it in a tempdir, not the repo.
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = load_config(os.path.join(tmpdir, "non_existing_config.yaml"))
         self.assertIn("base_url", config)
         self.assertEqual(config["base_url"], "https://www.techbend.io")
         # Ensure connection_string is set (from env or fallback).
@@ -44,6 +48,17 @@ class TestConfig(unittest.TestCase):
             or config["connection_string"].startswith("postgresql")
         )
 
+    def test_config_cache_invalidation(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_file = os.path.join(tmpdir, "config.yaml")
+            first = load_config(config_file)
+            # Unchanged file, same mtime: the cached dict is returned as-is.
+            self.assertIs(load_config(config_file), first)
+            clear_config_cache()
+            reloaded = load_config(config_file)
+            self.assertIsNot(reloaded, first)
+            self.assertEqual(reloaded["base_url"], first["base_url"])
+
 
 # -------------------------------
 # Tests for DBHandler
@@ -69,6 +84,48 @@ class TestDBHandler(unittest.TestCase):
         url, depth = self.db.get_next_url(1)
         self.assertIsNone(url)
 
+    def test_insert_urls_bulk(self):
+        self.db.insert_url("https://example.com/known", 0, "visited")
+        rows = [
+            {
+                "url": "https://example.com/a",
+                "depth": 1,
+                "status": "to_visit",
+                "content_type": None,
+            },
+            {
+                "url": "https://example.com/a",  # intra-batch duplicate
+                "depth": 2,
+                "status": "to_visit",
+                "content_type": None,
+            },
+            {
+                "url": "https://example.com/known",  # already in the table
+                "depth": 1,
+                "status": "to_visit",
+                "content_type": None,
+            },
+            {
+                "url": "https://example.com/b",
+                "depth": 1,
+                "status": "to_visit",
+                "content_type": None,
+            },
+        ]
+        self.db.insert_urls(rows)
+        urls = set(self.db.get_all_urls())
+        self.assertEqual(
+            urls,
+            {
+                "https://example.com/known",
+                "https://example.com/a",
+                "https://example.com/b",
+            },
+        )
+        # The duplicate's first occurrence won: depth stays 1.
+        url, depth = self.db.get_next_url(5)
+        self.assertEqual(depth, 1)
+
 
 # -------------------------------
 # Tests for LLM Integration in SiteCrawler
@@ -103,19 +160,14 @@ class TestLLMIntegration(unittest.TestCase):
         }
         self.crawler = SiteCrawler(self.config)
 
-    @patch("httpx.post")
+    @patch("httpx.Client.post")
     def test_get_summary_and_tags_success(self, mock_post):
         # Simulate a successful LLM response.
         fake_response = MagicMock()
-        fake_response.json.return_value = {
-            "choices": [
-                {
-                    "message": {
-                        "content": '{"summary": "Test summary", "tags": ["tag1", "tag2"]}'
-                    }
-                }
-            ]
-        }
+        fake_response.content = (
+            b'{"choices": [{"message": {"content": '
+            b'"{\\"summary\\": \\"Test summary\\", \\"tags\\": [\\"tag1\\", \\"tag2\\"]}"}}]}'
+        )
         fake_response.raise_for_status = lambda: None
         mock_post.return_value = fake_response
 
@@ -123,11 +175,11 @@ class TestLLMIntegration(unittest.TestCase):
         self.assertEqual(summary, "Test summary")
         self.assertEqual(tags, ["tag1", "tag2"])
 
-    @patch("httpx.post")
+    @patch("httpx.Client.post")
     def test_get_summary_and_tags_error(self, mock_post):
         # Simulate an LLM error response.
         fake_response = MagicMock()
-        fake_response.json.return_value = {"error": "Some error"}
+        fake_response.content = b'{"error": "Some error"}'
         fake_response.raise_for_status = lambda: None
         mock_post.return_value = fake_response
 
@@ -165,6 +217,51 @@ class TestSitemapGeneration(unittest.TestCase):
         self.assertIn("https://example.com", sitemap_str)
         self.assertIn("https://example.com/about", sitemap_str)
 
+    def test_write_sitemap(self):
+        dummy_urls = {"https://example.com", "https://example.com/a&b"}
+        config = {
+            "base_url": "https://example.com",
+            "llm": {},
+            "depth_settings": {},
+            "url_settings": {},
+            "connection_string": "sqlite:///:memory:",
+        }
+        crawler = SiteCrawler(config)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "sitemap.xml")
+            crawler.write_sitemap(dummy_urls, path)
+            root = ET.parse(path).getroot()
+        locs = {loc.text for loc in root.iter() if loc.tag.endswith("loc")}
+        self.assertEqual(locs, dummy_urls)
+
+
+# -------------------------------
+# Tests for Bulk URL Enqueueing
+# -------------------------------
+class TestAddUrls(unittest.TestCase):
+    def test_add_urls_filters_and_counts(self):
+        config = {
+            "base_url": "https://example.com",
+            "exclude_url_patterns": ["forbidden"],
+            "depth_settings": {},
+            "url_settings": {},
+            "connection_string": "sqlite:///:memory:",
+        }
+        crawler = SiteCrawler(config)
+        count = crawler.add_urls(
+            [
+                ("https://example.com/a", 0),
+                ("https://example.com/a", 0),  # duplicate
+                ("https://example.com/forbidden", 0),  # excluded
+                ("https://example.com/b", 0),
+            ]
+        )
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            set(crawler.db.get_all_urls()),
+            {"https://example.com/a", "https://example.com/b"},
+        )
+
 
 # -------------------------------
 # Tests for URL Exclusion Logic